@@ -0,0 +1,58 @@
+"""
+On-disk cache of cleaned /data/ responses, revalidated with ETag / Last-Modified.
+
+Each query (domain, language, filters) maps to a cleaned Parquet file plus a
+``.meta.json`` sidecar holding the validators the API sent with it.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Mapping
+
+import pandas as pd
+
+
+def cache_key(domain_code: str, lang: str, filters: dict[str, Any]) -> str:
+    """Stable file stem for a query."""
+    query = json.dumps([domain_code, lang, sorted(filters.items())], default=str)
+    return f"{domain_code}-{hashlib.sha256(query.encode()).hexdigest()[:16]}"
+
+
+def load_validators(cache_dir: Path, key: str) -> dict[str, str]:
+    """Conditional request headers for a cached query, or {} if nothing usable is cached."""
+    meta_path = cache_dir / f"{key}.meta.json"
+    if not (cache_dir / f"{key}.parquet").exists() or not meta_path.exists():
+        return {}
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    validators = {}
+    if meta.get("etag"):
+        validators["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        validators["If-Modified-Since"] = meta["last_modified"]
+    return validators
+
+
+def load_frame(cache_dir: Path, key: str) -> pd.DataFrame:
+    """Read back the cleaned DataFrame stored for a query."""
+    return pd.read_parquet(cache_dir / f"{key}.parquet")
+
+
+def save_frame(cache_dir: Path, key: str, df: pd.DataFrame, headers: Mapping[str, str]) -> bool:
+    """
+    Store a cleaned DataFrame with the response's validators.
+
+    Responses without an ETag or Last-Modified header can't be revalidated,
+    so nothing is written for them. Returns True if the entry was stored.
+    """
+    meta = {"etag": headers.get("etag"), "last_modified": headers.get("last-modified")}
+    if not any(meta.values()):
+        return False
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(cache_dir / f"{key}.parquet", index=False)
+    # Sidecar last: a parquet without its sidecar is never treated as cached
+    (cache_dir / f"{key}.meta.json").write_text(json.dumps(meta))
+    return True
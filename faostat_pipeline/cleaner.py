@@ -4,13 +4,33 @@ Normalises column names, casts types, removes nulls, and adds metadata.
 """
 
 import re
+import string
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
+# Keys FAOSTAT responses have been seen to wrap their record list in
+_ENVELOPE_KEYS = ("data", "Data", "items", "results")
 
-def clean_data(raw: dict[str, Any] | list[dict]) -> pd.DataFrame:
+_UPPER = frozenset(string.ascii_uppercase)
+_LOWER = frozenset(string.ascii_lowercase)
+
+# Thresholds for storing a string column as a pandas categorical
+_MAX_CATEGORIES = 10_000
+_MAX_CATEGORY_RATIO = 0.5
+# FAOSTAT dimension labels, always stored as categoricals in compact mode
+_CATEGORY_COLS = frozenset({"domain", "area", "element", "item", "unit", "flag", "flag_description"})
+# Code columns, including qualified ones such as "item_code_(cpc)" or "area_code_(m49)"
+_CODE_COL = re.compile(r".*_code(_\(.*\))?")
+# Dimension labels that must each have a code column before codes can identify a row
+_DIMENSION_COLS = frozenset({"area", "element", "item", "months", "reporter_countries", "partner_countries"})
+
+
+def clean_data(raw: dict[str, Any] | list[dict], compact: bool = True) -> pd.DataFrame:
     """
     Clean a raw FAOSTAT /data/ response into a tidy DataFrame.
 
@@ -21,61 +41,215 @@ def clean_data(raw: dict[str, Any] | list[dict]) -> pd.DataFrame:
       4. Drop fully-null rows
       5. Deduplicate
       6. Add fetched_at timestamp
+
+    With ``compact`` (the default) numeric columns are stored in the narrowest
+    dtype that holds them exactly (Int16 years; float32 values only when every
+    value round-trips through float32 unchanged, else float64) and
+    repetitive string columns become categoricals. Pass ``compact=False`` to
+    keep Int64/float64 and plain strings.
     """
     records = _extract_records(raw)
     if not records:
         return pd.DataFrame()
 
-    df = pd.DataFrame(records)
-    df = _normalize_columns(df)
-    df = _cast_types(df)
+    # Passing the columns up front skips pandas' key-union pass over every record
+    keys = list(records[0])
+    df = pd.DataFrame.from_records(records, columns=keys)
+    df.columns = [_to_snake_case(k) for k in keys]
+    return _clean_frame(df, compact=compact)
+
+
+def clean_table(table: pa.Table, compact: bool = True) -> pd.DataFrame:
+    """
+    Clean records already parsed into a pyarrow Table (as returned by get_data_table).
+
+    Applies the same steps as clean_data; Arrow has already typed the columns,
+    so only the string ones still need parsing.
+    """
+    if not table.num_rows:
+        return pd.DataFrame()
+
+    df = table.to_pandas()
+    df.columns = [_to_snake_case(k) for k in table.column_names]
+    return _clean_frame(df, compact=compact)
+
+
+def _clean_frame(df: pd.DataFrame, compact: bool) -> pd.DataFrame:
+    """Cast, drop empty rows, deduplicate and stamp a freshly built DataFrame."""
+    df = _cast_types(df, compact=compact)
     df = _drop_empty_rows(df)
-    df = df.drop_duplicates()
-    df["fetched_at"] = datetime.now(tz=timezone.utc).isoformat()
+    df = _deduplicate(df)
+    # One category shared by every row rather than a copy of the string per row
+    fetched_at = datetime.now(tz=timezone.utc).isoformat()
+    df["fetched_at"] = pd.Categorical.from_codes(
+        np.zeros(len(df), dtype=np.int8), categories=[fetched_at]
+    )
     return df
 
 
+def find_records(raw: Any) -> tuple[str | None, list | None]:
+    """
+    Locate the list of records in a FAOSTAT response envelope.
+
+    Returns ``(key, records)``, where ``key`` is the envelope key the list was
+    found under (None for a bare list), or ``(None, None)`` if there is no list.
+    """
+    if isinstance(raw, list):
+        return None, raw
+    if isinstance(raw, dict):
+        # FAOSTAT uses "data"; the other envelope keys are rare fallbacks
+        for key in _ENVELOPE_KEYS:
+            records = raw.get(key)
+            if isinstance(records, list):
+                return key, records
+    return None, None
+
+
 def _extract_records(raw: dict[str, Any] | list[dict]) -> list[dict]:
     """Pull the list of records out of the FAOSTAT response envelope."""
-    if isinstance(raw, list):
-        return raw
-    # Common FAOSTAT response keys: "data", "Data", "items", "results"
-    for key in ("data", "Data", "items", "results"):
-        if key in raw and isinstance(raw[key], list):
-            return raw[key]
+    _, records = find_records(raw)
+    if records is not None:
+        return records
     # If it's a flat dict with no nested list, wrap it
     return [raw] if raw else []
 
 
+@lru_cache(maxsize=1024)
 def _to_snake_case(name: str) -> str:
-    """Convert a column name to snake_case."""
-    name = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", name)
-    name = re.sub(r"([a-z\d])([A-Z])", r"\1_\2", name)
-    name = re.sub(r"[\s\-]+", "_", name)
-    return name.lower().strip("_")
+    """
+    Convert a column name to snake_case in a single pass.
 
+    An underscore is inserted before an uppercase letter that follows a
+    lowercase letter or digit ("areaCode" -> "area_code"), or that ends an
+    acronym ("HTTPServer" -> "http_server"). Runs of whitespace and hyphens
+    collapse to a single underscore.
+    """
+    out: list[str] = []
+    last = len(name) - 1
+    prev = ""
+    in_sep = False
+    for i, ch in enumerate(name):
+        if ch == "-" or ch.isspace():
+            if not in_sep:
+                out.append("_")
+                in_sep = True
+            prev = ch
+            continue
+        in_sep = False
+        if ch in _UPPER and (
+            prev in _LOWER
+            or prev.isdecimal()
+            or (prev in _UPPER and i < last and name[i + 1] in _LOWER)
+        ):
+            out.append("_")
+        out.append(ch)
+        prev = ch
+    return "".join(out).lower().strip("_")
+
+
+def _cast_types(df: pd.DataFrame, compact: bool = True) -> pd.DataFrame:
+    """Cast well-known columns to their expected types, downcasting if ``compact``."""
+    year_cols = [c for c in df.columns if "year" in c]
+    value_cols = [c for c in df.columns if c in ("value", "val", "quantity", "amount")]
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Rename all columns to snake_case."""
-    df.columns = [_to_snake_case(col) for col in df.columns]
-    return df
+    # Only columns that arrived as strings need parsing; numeric ones go straight to astype
+    for col in year_cols:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = _parse_repeated(df[col])
+    for col in value_cols:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
 
+    if compact:
+        dtypes = {c: _value_dtype(df[c]) for c in value_cols}
+        dtypes |= {c: _year_dtype(df[c]) for c in year_cols}
+        dtypes |= {c: "category" for c in _category_cols(df)}
+    else:
+        dtypes = {c: "Int64" for c in year_cols} | {c: "float64" for c in value_cols}
+    return df.astype(dtypes) if dtypes else df
 
-def _cast_types(df: pd.DataFrame) -> pd.DataFrame:
-    """Cast well-known columns to their expected types."""
-    year_cols = [c for c in df.columns if "year" in c]
-    for col in year_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
 
-    value_cols = [c for c in df.columns if c in ("value", "val", "quantity", "amount")]
-    for col in value_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+def _parse_repeated(col: pd.Series) -> pd.Series:
+    """
+    pd.to_numeric(errors="coerce") for a low-cardinality column.
 
-    return df
+    A year column holds a few dozen distinct strings repeated across every
+    row, so each distinct value is parsed once and broadcast back by its code.
+    """
+    codes, uniques = pd.factorize(col)
+    if not len(uniques):
+        return pd.Series(np.nan, index=col.index, name=col.name)
+    parsed = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(dtype="float64")
+    # factorize marks missing values with -1
+    values = np.where(codes >= 0, parsed.take(codes, mode="clip"), np.nan)
+    return pd.Series(values, index=col.index, name=col.name)
+
+
+def _category_cols(df: pd.DataFrame) -> list[str]:
+    """FAOSTAT label columns plus other string columns with few distinct values."""
+    if df.empty:
+        return []
+    cols = []
+    for col in df.columns:
+        series = df[col]
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            continue
+        if col in _CATEGORY_COLS:
+            cols.append(col)
+            continue
+        uniques = series.nunique(dropna=True)
+        if uniques < _MAX_CATEGORIES and uniques / len(df) < _MAX_CATEGORY_RATIO:
+            cols.append(col)
+    return cols
+
+
+def _value_dtype(col: pd.Series) -> str:
+    """
+    Return float32 only if every value survives the float32 round trip exactly.
+
+    pd.to_numeric(downcast="float") tolerates rounding (12345.6789 would come
+    back as 12345.6787...), so the check is done here instead.
+    """
+    values = col.to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(over="ignore"):
+        narrowed = values.astype("float32").astype("float64")
+    if ((narrowed == values) | np.isnan(values)).all():
+        return "float32"
+    return "float64"
+
+
+def _year_dtype(col: pd.Series) -> str:
+    """Return Int16 if every year fits in it (FAOSTAT years do), else Int64."""
+    lo, hi = col.min(), col.max()
+    bounds = np.iinfo(np.int16)
+    if pd.isna(lo) or (lo >= bounds.min and hi <= bounds.max):
+        return "Int16"
+    return "Int64"
+
+
+def _deduplicate(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop duplicate observations, keeping the last one.
+
+    FAOSTAT returns one code column per dimension (area_code, element_code,
+    item_code_(cpc), months_code, ...) which together with the year identify
+    an observation, so hashing those is enough. That only holds if every
+    dimension label present has a code column; otherwise (e.g. responses
+    fetched without codes) whole rows are compared.
+    """
+    code_cols = [c for c in df.columns if _CODE_COL.fullmatch(c)]
+    labels = [c for c in df.columns if c in _DIMENSION_COLS]
+    covered = all(any(code.startswith(f"{label}_code") for code in code_cols) for label in labels)
+    if "year" in df.columns and code_cols and covered:
+        return df.drop_duplicates(subset=["year", *code_cols], keep="last")
+    return df.drop_duplicates()
 
 
 def _drop_empty_rows(df: pd.DataFrame) -> pd.DataFrame:
-    """Drop rows where all non-metadata columns are null."""
+    """Drop rows where all non-metadata columns are null, in place."""
     meta_cols = {"fetched_at"}
     data_cols = [c for c in df.columns if c not in meta_cols]
-    return df.dropna(subset=data_cols, how="all").reset_index(drop=True)
+    # clean_data owns the frame, so mutating it avoids two full copies
+    df.dropna(subset=data_cols, how="all", inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return df
@@ -20,7 +20,13 @@ import click
 from rich.console import Console
 from rich.table import Table
 
-from .client import FAOSTATClient, FAOSTATAuthError
+try:
+    import uvloop  # optional: pip install "faostat-pipeline[fast]"
+except ImportError:
+    uvloop = None
+
+from .cleaner import find_records
+from .client import FAOSTATClient, FAOSTATAuthError, close_all
 from .endpoints import (
     ping,
     get_groups,
@@ -36,17 +42,11 @@ from .spinner import spin_while
 console = Console()
 
 
-def _extract_list(
-    response: Any,
-    fallback_keys: tuple[str, ...] = ("data", "Data", "items", "results"),
-) -> list:
+def _extract_list(response: Any) -> list:
     """Extract a list of records from an API response, trying common envelope keys."""
-    if isinstance(response, list):
-        return response
-    if isinstance(response, dict):
-        for key in fallback_keys:
-            if key in response and isinstance(response[key], list):
-                return response[key]
+    _, records = find_records(response)
+    if records is not None:
+        return records
     console.print(
         f"[yellow]Warning:[/yellow] Unexpected response structure. "
         f"Keys: {list(response.keys()) if isinstance(response, dict) else type(response).__name__}"
@@ -57,7 +57,16 @@ def _extract_list(
 
 def run(coro):
     """Helper to run async functions from sync Click commands."""
-    return asyncio.run(coro)
+    async def _main():
+        try:
+            return await coro
+        finally:
+            await close_all()
+
+    # libuv's event loop cuts per-task scheduling overhead on large batches
+    if uvloop is not None:
+        return uvloop.run(_main())
+    return asyncio.run(_main())
 
 
 def _handle_errors(func):
@@ -81,7 +90,15 @@ def _handle_errors(func):
 @click.group()
 @click.option("-v", "--verbose", is_flag=True, default=False, help="Enable debug logging")
 def cli(verbose: bool):
-    """FAOSTAT Data Pipeline — download and clean FAO agricultural statistics."""
+    """FAOSTAT Data Pipeline — download and clean FAO agricultural statistics.
+
+    Settings are read from the environment or a .env file:
+
+    \b
+      FAOSTAT_API_TOKEN   API token (required)
+      FAOSTAT_BASE_URL    API base URL
+      FAOSTAT_RATE_LIMIT  Requests per second, shared by all requests (default 2)
+    """
     if verbose:
         logging.basicConfig(
             level=logging.DEBUG,
@@ -188,17 +205,29 @@ def datasize(domain_code: str, lang: str, area, element, item, year):
 @click.argument("domain_codes", nargs=-1, required=True)
 @click.option("--lang", default="en", show_default=True, help="Language code")
 @click.option("--output", "-o", default="./output", show_default=True, help="Output directory")
-@click.option("--no-csv", is_flag=True, default=False, help="Skip CSV output")
+@click.option("--csv", "with_csv", is_flag=True, default=False, help="Also write CSV output")
 @click.option("--no-parquet", is_flag=True, default=False, help="Skip Parquet output")
-@click.option("--compression", default="snappy", show_default=True,
-              type=click.Choice(["snappy", "gzip", "brotli", "none"]),
+@click.option("--compression", default="zstd", show_default=True,
+              type=click.Choice(["zstd", "snappy", "gzip", "brotli", "none"]),
               help="Parquet compression codec")
+@click.option("--compression-level", default=None, type=int,
+              help="Codec level for zstd, gzip or brotli (zstd defaults to 3)")
 @click.option("--area", default=None, help="Filter by area codes (comma-separated)")
 @click.option("--element", default=None, help="Filter by element codes (comma-separated)")
 @click.option("--item", default=None, help="Filter by item codes (comma-separated)")
 @click.option("--year", default=None, help="Filter by year codes (comma-separated)")
+@click.option("--concurrency", default=4, show_default=True, type=click.IntRange(min=1),
+              help="Domains processed at once when fetching several")
+@click.option("--stream", is_flag=True, default=False,
+              help="Write records in batches to bound memory on very large domains; "
+                   "duplicates are only removed within each batch")
+@click.option("--cache", is_flag=True, default=False,
+              help="Reuse data cached under OUTPUT/.cache when the API reports it unchanged")
+@click.option("--partition-by", default=None,
+              help="Write Parquet as a dataset partitioned by these columns (comma-separated, e.g. year)")
 @_handle_errors
-def fetch(domain_codes, lang, output, no_csv, no_parquet, compression, area, element, item, year):
+def fetch(domain_codes, lang, output, with_csv, no_parquet, compression, compression_level,
+          area, element, item, year, concurrency, stream, cache, partition_by):
     """
     Fetch, clean, and export data for one or more DOMAIN_CODES.
 
@@ -208,19 +237,28 @@ def fetch(domain_codes, lang, output, no_csv, no_parquet, compression, area, ele
       faostat-pipeline fetch QCL
       faostat-pipeline fetch QCL TM FS --output ./data
       faostat-pipeline fetch QCL --area 231 --year 2020,2021,2022
-      faostat-pipeline fetch QCL --no-csv
+      faostat-pipeline fetch QCL --csv
+      faostat-pipeline fetch QCL --partition-by year
     """
     filters = {}
     for k, v in [("area", area), ("element", element), ("item", item), ("year", year)]:
         if v:
             filters[k] = v
 
-    to_csv = not no_csv
+    to_csv = with_csv
     to_parquet = not no_parquet
 
     if not to_csv and not to_parquet:
         console.print("[red]Error:[/red] At least one of CSV or Parquet output must be enabled.")
         raise click.Abort()
+    if compression_level is not None and compression in ("snappy", "none"):
+        console.print(f"[red]Error:[/red] --compression {compression} does not take a --compression-level.")
+        raise click.Abort()
+
+    partition_cols = [c.strip() for c in partition_by.split(",") if c.strip()] if partition_by else None
+    if partition_cols and stream:
+        console.print("[red]Error:[/red] --partition-by cannot be combined with --stream.")
+        raise click.Abort()
 
     console.print(f"\n[bold blue]FAOSTAT Pipeline[/bold blue]")
     console.print(f"Domains  : {', '.join(domain_codes)}")
@@ -236,7 +274,11 @@ def fetch(domain_codes, lang, output, no_csv, no_parquet, compression, area, ele
                 to_csv=to_csv,
                 to_parquet=to_parquet,
                 parquet_compression=compression,
+                parquet_compression_level=compression_level,
                 filters=filters,
+                stream=stream,
+                cache=cache,
+                partition_cols=partition_cols,
             )
             for fmt, path in written.items():
                 console.print(f"[green]✓[/green] {fmt.upper()}: {path}")
@@ -248,7 +290,12 @@ def fetch(domain_codes, lang, output, no_csv, no_parquet, compression, area, ele
                 to_csv=to_csv,
                 to_parquet=to_parquet,
                 parquet_compression=compression,
+                parquet_compression_level=compression_level,
                 filters=filters,
+                concurrency=concurrency,
+                stream=stream,
+                cache=cache,
+                partition_cols=partition_cols,
             )
         console.print("\n[bold green]Done![/bold green]")
 
@@ -1,19 +1,25 @@
 """
-FAOSTAT HTTP client with rate limiting (max 2 req/s) and automatic retries.
+FAOSTAT HTTP client with rate limiting (2 req/s by default) and automatic retries.
 """
 
 import asyncio
 import base64
+import contextlib
+import email.utils
 import json as _json
 import logging
+import math
 import os
 import time
 import warnings
-from typing import Any
+from functools import lru_cache
+from typing import IO, Any, AsyncIterator
 
 import httpx
+import ijson
+import orjson
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter
 
 load_dotenv()
 
@@ -22,12 +28,33 @@ logger = logging.getLogger("faostat_pipeline")
 BASE_URL = os.getenv("FAOSTAT_BASE_URL", "https://api-faostat.dev.fao.org/api/v1")
 API_TOKEN = os.getenv("FAOSTAT_API_TOKEN", "")
 
-# Rate limiter: max 2 requests per second
-_RATE_LIMIT = 2  # requests per second
-_MIN_INTERVAL = 1.0 / _RATE_LIMIT  # seconds between requests
-_last_request_time: float = 0.0
+def _rate_limit_from_env() -> float:
+    """Requests per second from FAOSTAT_RATE_LIMIT (default 2); must be positive."""
+    value = os.getenv("FAOSTAT_RATE_LIMIT", "2")
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = math.nan
+    if not (math.isfinite(rate) and rate > 0):
+        raise ValueError(
+            f"FAOSTAT_RATE_LIMIT must be a positive number of requests per second, got {value!r}."
+        )
+    return rate
+
+
+# Rate limiter: token bucket refilled at _RATE_LIMIT tokens/s, holding at most
+# _RATE_LIMIT tokens, so short bursts go out together while the average stays capped
+_RATE_LIMIT = _rate_limit_from_env()
+_tokens: float = _RATE_LIMIT
+_last_refill: float = time.monotonic()
 _rate_lock = asyncio.Lock()
 
+# One connection pool per base URL, shared by every FAOSTATClient on the same event
+# loop so repeated clients skip the TCP/TLS handshake. Closed by close_all().
+_shared_clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+# Open FAOSTATClients per pool; close_all() leaves pools that are still in use
+_pool_users: dict[httpx.AsyncClient, int] = {}
+
 
 class FAOSTATAuthError(Exception):
     """Raised when the API token is missing or invalid."""
@@ -36,50 +63,165 @@ class FAOSTATAuthError(Exception):
 class FAOSTATRateLimitError(Exception):
     """Raised when the API rate limit is exceeded."""
 
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after  # seconds, from the Retry-After header
+
 
 class FAOSTATServerError(Exception):
     """Raised when the API returns a 5xx server error."""
 
 
-def _check_token_expiry(token: str) -> None:
-    """Raise if JWT is expired; warn if less than 10 minutes remain."""
+class FAOSTATNotModified(Exception):
+    """Raised when a conditional request gets 304: the cached copy is still current."""
+
+
+@lru_cache(maxsize=8)
+def _decode_jwt_exp(token: str) -> float | None:
+    """Return the JWT ``exp`` claim, or None if absent or the token isn't a JWT."""
     try:
         payload_b64 = token.split(".")[1]
         payload_b64 += "=" * (4 - len(payload_b64) % 4)
         claims = _json.loads(base64.urlsafe_b64decode(payload_b64))
-        exp = claims.get("exp")
-        if exp is None:
-            return
-        remaining = exp - time.time()
-        if remaining <= 0:
-            raise FAOSTATAuthError(
-                f"Your FAOSTAT_API_TOKEN expired {abs(int(remaining))} seconds ago. "
-                "Please log in again at the developer portal and update your .env file."
-            )
-        if remaining < 600:  # less than 10 minutes
-            warnings.warn(
-                f"Your FAOSTAT_API_TOKEN expires in {int(remaining)} seconds "
-                f"({int(remaining / 60)} minutes). Consider refreshing soon.",
-                stacklevel=3,
-            )
+        return claims.get("exp")
     except (IndexError, ValueError, KeyError):
-        pass  # not a JWT or can't decode — skip check
+        return None  # not a JWT or can't decode — skip check
+
+
+def _check_token_expiry(token: str) -> None:
+    """Raise if JWT is expired; warn if less than 10 minutes remain."""
+    exp = _decode_jwt_exp(token)
+    if exp is None:
+        return
+    remaining = exp - time.time()
+    if remaining <= 0:
+        raise FAOSTATAuthError(
+            f"Your FAOSTAT_API_TOKEN expired {abs(int(remaining))} seconds ago. "
+            "Please log in again at the developer portal and update your .env file."
+        )
+    if remaining < 600:  # less than 10 minutes
+        warnings.warn(
+            f"Your FAOSTAT_API_TOKEN expires in {int(remaining)} seconds "
+            f"({int(remaining / 60)} minutes). Consider refreshing soon.",
+            stacklevel=3,
+        )
+
+
+async def _shared_client(base_url: str) -> httpx.AsyncClient:
+    """Return the pooled AsyncClient for ``base_url``, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    entry = _shared_clients.get(base_url)
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        if entry is not None:
+            # Left over from an earlier event loop that never called close_all()
+            await _discard(entry[1])
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=60.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+        _shared_clients[base_url] = (loop, client)
+        return client
+    return entry[1]
+
+
+async def close_all() -> None:
+    """
+    Close the shared connection pools. Call once before the event loop exits.
+
+    Pools still borrowed by an open FAOSTATClient on this loop are left
+    alone, so one caller finishing doesn't pull the pool from under another.
+    """
+    loop = asyncio.get_running_loop()
+    for base_url, (pool_loop, client) in list(_shared_clients.items()):
+        if pool_loop is loop and _pool_users.get(client):
+            continue
+        del _shared_clients[base_url]
+        _pool_users.pop(client, None)
+        await _discard(client)
+
+
+async def _discard(client: httpx.AsyncClient) -> None:
+    """Close a pool; one from a finished event loop is released as far as possible."""
+    with contextlib.suppress(Exception):
+        await client.aclose()
 
 
 def _retry_on_transient(retry_state) -> bool:
-    """Retry on transport errors and 5xx server errors."""
+    """Retry on transport errors, 429 rate limiting and 5xx server errors."""
     exc = retry_state.outcome.exception()
     if exc is None:
         return False
-    if isinstance(exc, httpx.TransportError):
+    if isinstance(exc, (httpx.TransportError, FAOSTATRateLimitError)):
         return True
     if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code >= 500:
         return True
     return False
 
 
+# Longest Retry-After we will sleep for; beyond that, back off as usual
+_MAX_RETRY_AFTER = 60.0
+_backoff = wait_exponential_jitter(initial=1, max=10, jitter=1)
+
+
+def _wait_retry_after(retry_state) -> float:
+    """Sleep for the server's Retry-After if it sent one, else exponential backoff with jitter."""
+    exc = retry_state.outcome.exception()
+    delay = None
+    if isinstance(exc, FAOSTATRateLimitError):
+        delay = exc.retry_after
+    elif isinstance(exc, httpx.HTTPStatusError):
+        delay = _retry_after(exc.response)
+    if delay is None or delay > _MAX_RETRY_AFTER:
+        return _backoff(retry_state)
+    return delay
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+_retry = retry(
+    stop=stop_after_attempt(4),
+    wait=_wait_retry_after,
+    retry=_retry_on_transient,
+    reraise=True,
+)
+
+
+class _AsyncByteReader:
+    """Minimal async file-like wrapper so ijson can consume an httpx byte stream."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes with read(0) to detect bytes vs str
+            return b""
+        return await anext(self._chunks, b"")
+
+
 class FAOSTATClient:
-    """Async HTTP client for the FAOSTAT REST API."""
+    """
+    Async HTTP client for the FAOSTAT REST API.
+
+    Clients borrow a connection pool shared per base URL, so entering and
+    leaving the context manager is cheap; call close_all() when done
+    (run_pipeline and run_pipeline_batch do so for clients they open).
+    """
 
     def __init__(self, token: str | None = None, base_url: str | None = None):
         self.token = token or API_TOKEN
@@ -91,46 +233,44 @@ class FAOSTATClient:
             )
         _check_token_expiry(self.token)
         self._client: httpx.AsyncClient | None = None
-
-    def _headers(self) -> dict[str, str]:
-        return {
+        self._header_dict = {
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/json",
         }
 
     async def __aenter__(self) -> "FAOSTATClient":
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            headers=self._headers(),
-            timeout=60.0,
-        )
+        self._client = await _shared_client(self.base_url)
+        _pool_users[self._client] = _pool_users.get(self._client, 0) + 1
         return self
 
     async def __aexit__(self, *args: Any) -> None:
-        if self._client:
-            await self._client.aclose()
+        # The pool outlives this client; close_all() releases it
+        users = _pool_users.get(self._client, 0) - 1
+        if users > 0:
+            _pool_users[self._client] = users
+        else:
+            _pool_users.pop(self._client, None)
+        self._client = None
 
     async def _throttle(self) -> None:
-        """Enforce max 2 requests per second globally."""
-        global _last_request_time
+        """Take a token from the global bucket, sleeping if it is empty."""
+        global _tokens, _last_refill
         async with _rate_lock:
             now = time.monotonic()
-            elapsed = now - _last_request_time
-            if elapsed < _MIN_INTERVAL:
-                await asyncio.sleep(_MIN_INTERVAL - elapsed)
-            _last_request_time = time.monotonic()
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=_retry_on_transient,
-        reraise=True,
-    )
+            _tokens = min(_RATE_LIMIT, _tokens + (now - _last_refill) * _RATE_LIMIT)
+            _last_refill = now
+            # Reserve the token now; a negative balance is the wait still owed
+            _tokens -= 1
+            delay = -_tokens / _RATE_LIMIT if _tokens < 0 else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+
+    @_retry
     async def get(self, path: str, params: dict[str, Any] | None = None) -> Any:
         """Send a GET request with rate limiting and retries."""
         await self._throttle()
         assert self._client is not None, "Use client as async context manager"
-        response = await self._client.get(path, params=params)
+        response = await self._client.get(path, params=params, headers=self._header_dict)
         logger.debug(
             "GET %s -> %d (%d bytes, %s)",
             path, response.status_code, len(response.content),
@@ -140,22 +280,75 @@ class FAOSTATClient:
         if not response.content:
             return {"status": response.status_code}
         try:
-            return response.json()
+            return orjson.loads(response.content)
         except ValueError:
             logger.warning("Non-JSON response from GET %s: %.500s", path, response.text)
             return {"status": response.status_code, "text": response.text}
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=_retry_on_transient,
-        reraise=True,
-    )
+    async def iter_records(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        prefix: str = "data.item",
+    ) -> AsyncIterator[dict]:
+        """
+        Stream a GET response, yielding the records under ``prefix`` one by one.
+
+        Rate limited but not retried: a stream that fails part-way through
+        cannot be replayed without duplicating records already yielded.
+        """
+        await self._throttle()
+        assert self._client is not None, "Use client as async context manager"
+        async with self._client.stream("GET", path, params=params, headers=self._header_dict) as response:
+            if response.is_error:
+                await response.aread()
+                _raise_for_status(response)
+            reader = _AsyncByteReader(response.aiter_bytes())
+            async for record in ijson.items_async(reader, prefix, use_float=True):
+                yield record
+
+    @_retry
+    async def download(
+        self,
+        path: str,
+        dest: IO[bytes],
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Headers:
+        """
+        Stream a GET response body into ``dest`` without decoding it.
+
+        ``dest`` is rewound and truncated first, so a retried attempt starts
+        the file over. Extra ``headers`` (e.g. If-None-Match) are sent with
+        the request; a 304 reply raises FAOSTATNotModified. Returns the
+        response headers.
+        """
+        await self._throttle()
+        assert self._client is not None, "Use client as async context manager"
+        dest.seek(0)
+        dest.truncate()
+        request_headers = {**self._header_dict, **headers} if headers else self._header_dict
+        async with self._client.stream("GET", path, params=params, headers=request_headers) as response:
+            if response.status_code == 304:
+                raise FAOSTATNotModified(f"GET {path} not modified since the cached copy")
+            if response.is_error:
+                await response.aread()
+                _raise_for_status(response)
+            async for chunk in response.aiter_bytes(1 << 20):
+                dest.write(chunk)
+        logger.debug(
+            "GET %s -> %d (%d bytes streamed to file, %s)",
+            path, response.status_code, dest.tell(),
+            response.headers.get("content-type", "no content-type"),
+        )
+        return response.headers
+
+    @_retry
     async def post(self, path: str, json: Any = None) -> Any:
         """Send a POST request with rate limiting and retries."""
         await self._throttle()
         assert self._client is not None, "Use client as async context manager"
-        response = await self._client.post(path, json=json)
+        response = await self._client.post(path, json=json, headers=self._header_dict)
         logger.debug(
             "POST %s -> %d (%d bytes, %s)",
             path, response.status_code, len(response.content),
@@ -165,7 +358,7 @@ class FAOSTATClient:
         if not response.content:
             return {"status": response.status_code}
         try:
-            return response.json()
+            return orjson.loads(response.content)
         except ValueError:
             logger.warning("Non-JSON response from POST %s: %.500s", path, response.text)
             return {"status": response.status_code, "text": response.text}
@@ -187,5 +380,5 @@ def _raise_for_status(response: httpx.Response) -> None:
             "If your token expired, log in again at the developer portal and update .env."
         )
     if response.status_code == 429:
-        raise FAOSTATRateLimitError(f"429 Rate limit exceeded.{detail}")
+        raise FAOSTATRateLimitError(f"429 Rate limit exceeded.{detail}", _retry_after(response))
     response.raise_for_status()
@@ -3,10 +3,22 @@ Typed wrappers for every FAOSTAT API endpoint.
 All functions accept a FAOSTATClient and return parsed JSON (dict or list).
 """
 
-from typing import Any
+import asyncio
+import tempfile
+from typing import IO, Any, AsyncIterator
 
+import httpx
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pajson
+
+from .cleaner import find_records
 from .client import FAOSTATClient
 
+# pyarrow's JSON reader caps a block (and so a single JSON document) at 2 GiB
+_MAX_JSON_BLOCK = 2**31 - 1
+
 
 async def ping(client: FAOSTATClient) -> dict[str, Any]:
     """GET /ping — Check API health."""
@@ -71,6 +83,177 @@ async def get_data(
       year       : Year codes (e.g. "2020" or "2018,2019,2020")
       *_cs       : Use code sets instead of individual codes (area_cs, element_cs, etc.)
     """
+    params = _data_params(
+        area=area, element=element, item=item, year=year,
+        area_cs=area_cs, element_cs=element_cs, item_cs=item_cs, year_cs=year_cs,
+        show_codes=show_codes, show_unit=show_unit, show_flags=show_flags,
+        null_values=null_values, output_type=output_type,
+    )
+    return await client.get(f"/{lang}/data/{domain_code}", params=params)
+
+
+async def get_data_chunked(
+    client: FAOSTATClient,
+    domain_code: str,
+    *,
+    year_chunks: list[str],
+    lang: str = "en",
+    concurrency: int = 4,
+    **filters: Any,
+) -> dict[str, Any]:
+    """
+    Fetch data as one get_data request per year chunk, run concurrently.
+
+    Each entry of ``year_chunks`` is a year filter as accepted by get_data
+    (e.g. ["2000,2001,2002", "2003,2004,2005"]). At most ``concurrency``
+    requests are in flight; the client's rate limiter still caps req/s.
+    Records are concatenated in chunk order and returned as {"data": [...]}.
+    """
+    if "year" in filters:
+        raise ValueError("get_data_chunked takes its years from year_chunks; drop the 'year' filter.")
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _fetch(year: str) -> Any:
+        async with sem:
+            return await get_data(client, domain_code, lang=lang, year=year, **filters)
+
+    responses = await asyncio.gather(*(_fetch(year) for year in year_chunks))
+    records: list[dict] = []
+    for raw in responses:
+        records.extend(find_records(raw)[1] or [])
+    return {"data": records}
+
+
+async def get_data_table(
+    client: FAOSTATClient,
+    domain_code: str,
+    lang: str = "en",
+    **filters: Any,
+) -> pa.Table | Any:
+    """
+    GET /{lang}/data/{domain_code} — Fetch data as a pyarrow Table of records.
+
+    Accepts the same filters as get_data. The body is streamed to a temporary
+    file and parsed by pyarrow's JSON reader in one native pass, skipping the
+    Python object tree get_data builds. Responses Arrow cannot tabulate (no
+    records under "data", or a field mixing strings and numbers) are returned
+    as decoded JSON instead, exactly as get_data would return them.
+    """
+    data, _ = await get_data_table_if_modified(client, domain_code, {}, lang=lang, **filters)
+    return data
+
+
+async def get_data_table_if_modified(
+    client: FAOSTATClient,
+    domain_code: str,
+    validators: dict[str, str],
+    lang: str = "en",
+    **filters: Any,
+) -> tuple[pa.Table | Any, httpx.Headers]:
+    """
+    Conditional get_data_table, also returning the response headers.
+
+    ``validators`` are sent as request headers (If-None-Match and/or
+    If-Modified-Since); if the server answers 304, FAOSTATNotModified is raised.
+    """
+    with tempfile.TemporaryFile() as fh:
+        headers = await client.download(
+            f"/{lang}/data/{domain_code}", fh, params=_data_params(**filters), headers=validators,
+        )
+        return await asyncio.to_thread(_read_data_file, fh, fh.tell()), headers
+
+
+def _read_data_file(fh: IO[bytes], size: int) -> pa.Table | Any:
+    """Parse a downloaded /data/ body into a records Table, else into plain JSON."""
+    if 0 < size <= _MAX_JSON_BLOCK:
+        try:
+            envelope = _read_envelope(fh, size)
+            if envelope is not None:
+                # Arrow infers ISO-8601 text as timestamps; the JSON fallback
+                # keeps it as text, so re-read those fields as strings
+                schema = _untimestamped(envelope.schema.field("data").type)
+                if schema is not None:
+                    envelope = _read_envelope(fh, size, pa.schema([pa.field("data", schema)]))
+        except pa.ArrowInvalid:
+            envelope = None
+        if envelope is not None:
+            return pa.Table.from_struct_array(pc.list_flatten(envelope.column("data")))
+
+    fh.seek(0)
+    body = fh.read()
+    if not body:
+        return {}
+    try:
+        return orjson.loads(body)
+    except ValueError:
+        return {"text": body.decode(errors="replace")}
+
+
+def _read_envelope(fh: IO[bytes], size: int, schema: pa.Schema | None = None) -> pa.Table | None:
+    """Read a /data/ body with Arrow, or None if it has no list of records under "data"."""
+    fh.seek(0)
+    # The whole response is one JSON document, so it must fit in one block
+    envelope = pajson.read_json(
+        fh,
+        read_options=pajson.ReadOptions(block_size=size),
+        parse_options=pajson.ParseOptions(explicit_schema=schema, newlines_in_values=True),
+    )
+    if "data" not in envelope.column_names:
+        return None
+    records = envelope.schema.field("data").type
+    if pa.types.is_list(records) and pa.types.is_struct(records.value_type):
+        return envelope
+    return None
+
+
+def _untimestamped(records: pa.ListType) -> pa.ListType | None:
+    """The records type with timestamp fields read as strings, or None if it has none."""
+    fields = list(records.value_type)
+    if not any(pa.types.is_timestamp(f.type) for f in fields):
+        return None
+    return pa.list_(pa.struct([
+        f.with_type(pa.string()) if pa.types.is_timestamp(f.type) else f for f in fields
+    ]))
+
+
+async def iter_data_batches(
+    client: FAOSTATClient,
+    domain_code: str,
+    lang: str = "en",
+    batch_size: int = 50_000,
+    **filters: Any,
+) -> AsyncIterator[list[dict]]:
+    """
+    GET /{lang}/data/{domain_code} — Stream data as lists of up to ``batch_size`` records.
+
+    Accepts the same filters as get_data. Only one batch is held in memory at a time.
+    """
+    batch: list[dict] = []
+    async for record in client.iter_records(f"/{lang}/data/{domain_code}", params=_data_params(**filters)):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _data_params(
+    area: str | None = None,
+    element: str | None = None,
+    item: str | None = None,
+    year: str | None = None,
+    area_cs: str | None = None,
+    element_cs: str | None = None,
+    item_cs: str | None = None,
+    year_cs: str | None = None,
+    show_codes: bool = True,
+    show_unit: bool = True,
+    show_flags: bool = True,
+    null_values: bool = False,
+    output_type: str = "objects",
+) -> dict[str, Any]:
+    """Build the query string for the /data/ endpoint, omitting unset filters."""
     params: dict[str, Any] = {
         "show_codes": show_codes,
         "show_unit": show_unit,
@@ -83,8 +266,7 @@ async def get_data(
                      ("item_cs", item_cs), ("year_cs", year_cs)]:
         if val is not None:
             params[key] = val
-
-    return await client.get(f"/{lang}/data/{domain_code}", params=params)
+    return params
 
 
 async def get_datasize(
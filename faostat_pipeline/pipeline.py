@@ -2,47 +2,198 @@
 Pipeline orchestration: fetch → clean → export.
 """
 
+import asyncio
+import contextlib
 import logging
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, TypeVar
 
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+import pandas as pd
+import pyarrow as pa
+from rich.console import Console, Group
+from rich.progress import Progress
+from rich.text import Text
 
-from .client import FAOSTATClient
-from .cleaner import clean_data
-from .endpoints import get_data, get_datasize
-from .exporter import export
-from .spinner import spin_while
+from .cache import cache_key, load_frame, load_validators, save_frame
+from .client import FAOSTATClient, FAOSTATNotModified, close_all
+from .cleaner import clean_data, clean_table, find_records
+from .endpoints import get_data_table_if_modified, get_datasize, iter_data_batches
+from .exporter import export_async, export_stream
+from .spinner import spin_while, spinner_progress
 
 logger = logging.getLogger("faostat_pipeline")
-console = Console()
+T = TypeVar("T")
+# Markup only: regex highlighting of every printed path/number is wasted work
+console = Console(highlight=False)
 
 
-def _response_has_data(raw: Any) -> bool:
-    """Check whether the API response actually contains data records."""
-    if raw is None:
-        return False
+@dataclass(frozen=True)
+class _ResponseInfo:
+    """The shape of a /data/ response, gathered in one pass for logging and validation."""
+
+    kind: str
+    rows: int
+    keys: list[str] = field(default_factory=list)
+    status: Any = ""
+    message: str = ""
+
+
+def _summarise_response(raw: Any) -> _ResponseInfo:
+    """Count the records in a response; for empty envelopes, also pull status and message."""
+    if isinstance(raw, pa.Table):
+        return _ResponseInfo("arrow", raw.num_rows, raw.column_names)
     if isinstance(raw, list):
-        return len(raw) > 0
-    if isinstance(raw, dict):
-        for key in ("data", "Data", "items", "results"):
-            if key in raw and isinstance(raw[key], list):
-                return len(raw[key]) > 0
-        # If none of the known keys exist, the response is likely an error or empty envelope
-        return False
-    return False
+        return _ResponseInfo("list", len(raw))
+    if not isinstance(raw, dict):
+        return _ResponseInfo(type(raw).__name__, 0)
+
+    key, records = find_records(raw)
+    if key not in (None, "data"):
+        logger.debug("Response records found under %r instead of 'data'", key)
+    if records:
+        return _ResponseInfo("dict", len(records), list(raw))
+    # No records: likely an error or empty envelope, so keep what explains it
+    return _ResponseInfo(
+        "dict", 0, list(raw),
+        status=raw.get("status_code") or raw.get("status", ""),
+        message=str(raw.get("message") or raw.get("description", "") or raw.get("text", "")),
+    )
+
+
+@dataclass
+class _SizeCache:
+    """datasize responses keyed by (domain_code, lang, filters), shared across one batch."""
+    entries: dict[tuple, Any] = field(default_factory=dict)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+async def _cached_datasize(
+    client: FAOSTATClient,
+    domain_code: str,
+    lang: str,
+    filters: dict[str, Any],
+    cache: _SizeCache | None = None,
+) -> Any:
+    """get_datasize, memoised per query in ``cache`` if given. Failed lookups are not cached."""
+    payload = {"domain_code": domain_code, **filters}
+    if cache is None:
+        return await get_datasize(client, payload, lang=lang)
+    key = (domain_code, lang, frozenset(filters.items()))
+    # Held across the request: size probes are rate limited one at a time anyway
+    async with cache.lock:
+        if key not in cache.entries:
+            cache.entries[key] = await get_datasize(client, payload, lang=lang)
+        return cache.entries[key]
+
+
+def _size_count(size_task: asyncio.Task) -> Any:
+    """Row estimate from a finished datasize task, or None if it failed."""
+    if size_task.cancelled() or size_task.exception() is not None:
+        return None  # datasize is best-effort
+    size_info = size_task.result()
+    if not isinstance(size_info, dict):
+        return None
+    return size_info.get("count", size_info.get("size", "unknown"))
+
+
+def _print_size(size_task: asyncio.Task) -> None:
+    count = _size_count(size_task)
+    if count is not None:
+        console.print(f"  [dim]Estimated rows: {count}[/dim]")
+
+
+async def _unless_empty(fetch: Awaitable[T], size_task: asyncio.Task, domain_code: str) -> T:
+    """
+    Await ``fetch`` while the datasize probe runs alongside it.
+
+    If the probe finishes first and estimates zero rows, the fetch is
+    cancelled and the no-data error raised. If the fetch finishes first the
+    probe is no longer useful and is cancelled.
+    """
+    fetch_task = asyncio.ensure_future(fetch)
+    try:
+        await asyncio.wait((fetch_task, size_task), return_when=asyncio.FIRST_COMPLETED)
+        count = _size_count(size_task) if size_task.done() else None
+        if type(count) is int and count == 0:
+            raise ValueError(
+                f"No records returned for domain '{domain_code}': the API estimates 0 rows. "
+                "The domain may be empty, or your filters may be too restrictive."
+            )
+        return await fetch_task
+    finally:
+        fetch_task.cancel()
+        size_task.cancel()
+
+
+async def _clean_response(
+    raw: Any,
+    domain_code: str,
+    progress: Progress | None,
+    task: Any,
+) -> pd.DataFrame:
+    """Log and validate a /data/ response, then clean it off the event loop."""
+    info = _summarise_response(raw)
+    # %.500s keeps the preview lazy: large responses are only stringified at debug level
+    logger.debug(
+        "Response for %s: type=%s, rows=%d, keys=%s, preview=%.500s",
+        domain_code, info.kind, info.rows, info.keys, raw,
+    )
+
+    # Validate the API response contains data
+    if not info.rows:
+        console.print(
+            f"  [yellow]⚠ API returned no data for domain '{domain_code}'.[/yellow]"
+        )
+        if info.kind == "dict":
+            # Show all available info from the response
+            console.print(f"  [dim]Response keys: {info.keys}[/dim]")
+            if info.status:
+                console.print(f"  [dim]Status : {info.status}[/dim]")
+            if info.message:
+                console.print(f"  [dim]Message: {info.message[:300]}[/dim]")
+        raise ValueError(
+            f"No records returned for domain '{domain_code}'. "
+            "The domain may be empty, or your filters may be too restrictive. "
+            "Use -v flag for full debug output."
+        )
+
+    if task is not None:
+        progress.update(task, description=f"Cleaning [bold]{domain_code}[/bold]...")
+    # Off the event loop so concurrent batch domains keep fetching meanwhile
+    clean = clean_table if isinstance(raw, pa.Table) else clean_data
+    df = await asyncio.to_thread(clean, raw)
+
+    if df.empty:
+        console.print(f"  [yellow]⚠ Data cleaned to empty DataFrame for '{domain_code}'.[/yellow]")
+        if info.kind == "dict":
+            console.print(f"  [dim]Response keys: {info.keys}[/dim]")
+            console.print(f"  [dim]Raw preview: {str(raw)[:500]}[/dim]")
+        raise ValueError(
+            f"No usable records after cleaning for domain '{domain_code}'. "
+            "The API response format may not match expected structure. "
+            "Use -v flag for full debug output."
+        )
+    return df
 
 
 async def run_pipeline(
     domain_code: str,
     lang: str = "en",
     output_dir: str | Path = "./output",
-    to_csv: bool = True,
+    to_csv: bool = False,
     to_parquet: bool = True,
-    parquet_compression: str = "snappy",
+    parquet_compression: str = "zstd",
     filters: dict[str, Any] | None = None,
     check_size_first: bool = True,
+    show_progress: bool = True,
+    client: FAOSTATClient | None = None,
+    stream: bool = False,
+    progress: Progress | None = None,
+    cache: bool = False,
+    partition_cols: list[str] | None = None,
+    parquet_compression_level: int | None = None,
+    size_cache: _SizeCache | None = None,
 ) -> dict[str, Path]:
     """
     Fetch, clean, and export data for a single FAOSTAT domain.
@@ -51,97 +202,123 @@ async def run_pipeline(
         domain_code: FAOSTAT domain code (e.g. "QCL", "TM", "FS")
         lang: Language code (default: "en")
         output_dir: Directory to write output files
-        to_csv: Write CSV output
+        to_csv: Also write CSV output (off by default; CSV is slow and large)
         to_parquet: Write Parquet output
         parquet_compression: Parquet compression codec
         filters: Optional dict of query filters (area, element, item, year, etc.)
-        check_size_first: If True, log estimated row count before fetching
+        check_size_first: If True, probe the estimated row count while
+            fetching, and abandon the fetch if the estimate comes back zero
+        show_progress: Show spinners while fetching and cleaning, when the
+            console is a terminal. Rich allows one live display at a time, so
+            concurrent callers either turn this off or pass a shared ``progress``.
+        client: An open FAOSTATClient to reuse; one is opened if omitted
+        stream: Parse, clean and write the response in batches so memory stays
+            bounded for very large domains. Duplicates are only removed within
+            a batch, so a duplicate that spans two batches reaches the output
+            (the non-streamed path removes it). Dtypes are not downcast.
+        progress: A running Progress to add this domain's spinner to, so
+            several domains share one live display. Implies show_progress.
+        cache: Keep the cleaned data under ``output_dir/.cache`` and revalidate
+            it with If-None-Match / If-Modified-Since on the next run. When the
+            API answers 304 the cached frame is exported without downloading
+            or cleaning again. Ignored when streaming.
+        partition_cols: Write Parquet as a hive-partitioned dataset split on
+            these columns (e.g. ["year"]), so readers filtering on them can
+            skip whole files. Not supported with ``stream``.
+        parquet_compression_level: Codec level; defaults to 3 for zstd and the
+            codec's own default otherwise. Not accepted by snappy or none.
+        size_cache: Row-count probes to reuse, shared by run_pipeline_batch
+            across its domains; without one every call probes afresh.
 
     Returns:
-        Dict of written file paths: {"csv": Path, "parquet": Path}
+        Dict of written file paths: {"csv": Path, "parquet": Path}. With
+        ``partition_cols`` the Parquet path is the dataset directory.
     """
     filters = filters or {}
+    if stream and partition_cols:
+        raise ValueError("partition_cols is not supported with stream=True.")
 
-    async with FAOSTATClient() as client:
-        if check_size_first:
-            try:
-                size_payload = {"domain_code": domain_code, **filters}
-                size_info = await get_datasize(client, size_payload, lang=lang)
-                count = size_info.get("count", size_info.get("size", "unknown"))
-                console.print(f"  [dim]Estimated rows: {count}[/dim]")
-            except Exception:
-                pass  # datasize is best-effort
-
-        raw = await spin_while(
-            get_data(client, domain_code, lang=lang, **filters),
-            label=f"Fetching [bold]{domain_code}[/bold]",
-            console=console,
-        )
+    async with contextlib.AsyncExitStack() as stack:
+        if client is None:
+            # Registered first so it runs after the client has exited
+            stack.push_async_callback(close_all)
+            client = await stack.enter_async_context(FAOSTATClient())
 
-        # Log response structure for debugging
-        if isinstance(raw, dict):
-            logger.debug(
-                "Response for %s: type=dict, keys=%s, first_500=%s",
-                domain_code, list(raw.keys()), str(raw)[:500],
-            )
-        elif isinstance(raw, list):
-            logger.debug(
-                "Response for %s: type=list, length=%d, first_item=%s",
-                domain_code, len(raw), str(raw[0])[:300] if raw else "(empty)",
-            )
-        else:
-            logger.debug("Response for %s: type=%s, value=%s", domain_code, type(raw).__name__, str(raw)[:500])
+        # One spinner task per domain, reused by every stage below. Nobody
+        # watches a spinner in CI or redirected output, so skip it there.
+        if progress is None and show_progress and console.is_terminal:
+            progress = stack.enter_context(spinner_progress(console))
+        task = None
+        if progress is not None:
+            task = progress.add_task(f"[bold]{domain_code}[/bold]...", total=None)
+            stack.callback(progress.remove_task, task)
 
-        # Validate the API response contains data
-        if not _response_has_data(raw):
-            console.print(
-                f"  [yellow]⚠ API returned no data for domain '{domain_code}'.[/yellow]"
+        async def _spin(coro, label: str):
+            if progress is None:
+                return await coro
+            return await spin_while(
+                coro, label=label, console=console, progress=progress, task_id=task
             )
-            if isinstance(raw, dict):
-                # Show all available info from the response
-                console.print(f"  [dim]Response keys: {list(raw.keys())}[/dim]")
-                status = raw.get("status_code") or raw.get("status", "")
-                message = raw.get("message") or raw.get("description", "") or raw.get("text", "")
-                if status:
-                    console.print(f"  [dim]Status : {status}[/dim]")
-                if message:
-                    console.print(f"  [dim]Message: {str(message)[:300]}[/dim]")
-            raise ValueError(
-                f"No records returned for domain '{domain_code}'. "
-                "The domain may be empty, or your filters may be too restrictive. "
-                "Use -v flag for full debug output."
+
+        # The size probe runs alongside the fetch instead of ahead of it
+        size_task = None
+        if check_size_first:
+            size_task = asyncio.create_task(
+                _cached_datasize(client, domain_code, lang, filters, size_cache)
             )
+            size_task.add_done_callback(_print_size)
+            stack.callback(size_task.cancel)
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-            transient=True,
-        ) as progress:
-            task = progress.add_task(f"Cleaning [bold]{domain_code}[/bold]...", total=None)
-            df = clean_data(raw)
-
-            if df.empty:
-                progress.stop()
-                console.print(f"  [yellow]⚠ Data cleaned to empty DataFrame for '{domain_code}'.[/yellow]")
-                if isinstance(raw, dict):
-                    console.print(f"  [dim]Response keys: {list(raw.keys())}[/dim]")
-                    console.print(f"  [dim]Raw preview: {str(raw)[:500]}[/dim]")
-                raise ValueError(
-                    f"No usable records after cleaning for domain '{domain_code}'. "
-                    "The API response format may not match expected structure. "
-                    "Use -v flag for full debug output."
-                )
+        def _sized(coro):
+            if size_task is None:
+                return coro
+            return _unless_empty(coro, size_task, domain_code)
 
-            progress.update(task, description=f"Exporting [bold]{domain_code}[/bold]...")
-            written = export(
-                df,
+        if stream:
+            frames = (
+                await asyncio.to_thread(clean_data, batch, compact=False)
+                async for batch in iter_data_batches(client, domain_code, lang=lang, **filters)
+            )
+            write = export_stream(
+                frames,
                 domain_code=domain_code,
                 output_dir=output_dir,
                 to_csv=to_csv,
                 to_parquet=to_parquet,
                 parquet_compression=parquet_compression,
+                parquet_compression_level=parquet_compression_level,
             )
+            return await _spin(_sized(write), f"Streaming [bold]{domain_code}[/bold]")
+
+        cache_dir = Path(output_dir) / ".cache"
+        key = cache_key(domain_code, lang, filters)
+        validators = load_validators(cache_dir, key) if cache else {}
+        try:
+            # Parsed straight into Arrow; decoded JSON only if Arrow can't tabulate it
+            raw, headers = await _spin(
+                _sized(get_data_table_if_modified(client, domain_code, validators, lang=lang, **filters)),
+                f"Fetching [bold]{domain_code}[/bold]",
+            )
+        except FAOSTATNotModified:
+            console.print("  [dim]Unchanged since the cached copy; skipping download and cleaning[/dim]")
+            df = await asyncio.to_thread(load_frame, cache_dir, key)
+        else:
+            df = await _clean_response(raw, domain_code, progress, task)
+            if cache:
+                await asyncio.to_thread(save_frame, cache_dir, key, df, headers)
+
+        if task is not None:
+            progress.update(task, description=f"Exporting [bold]{domain_code}[/bold]...")
+        written = await export_async(
+            df,
+            domain_code=domain_code,
+            output_dir=output_dir,
+            to_csv=to_csv,
+            to_parquet=to_parquet,
+            parquet_compression=parquet_compression,
+            parquet_compression_level=parquet_compression_level,
+            partition_cols=partition_cols,
+        )
 
     return written
 
@@ -150,35 +327,66 @@ async def run_pipeline_batch(
     domain_codes: list[str],
     lang: str = "en",
     output_dir: str | Path = "./output",
-    to_csv: bool = True,
+    to_csv: bool = False,
     to_parquet: bool = True,
-    parquet_compression: str = "snappy",
+    parquet_compression: str = "zstd",
     filters: dict[str, Any] | None = None,
+    concurrency: int = 4,
+    stream: bool = False,
+    cache: bool = False,
+    partition_cols: list[str] | None = None,
+    parquet_compression_level: int | None = None,
 ) -> dict[str, dict[str, Path]]:
     """
-    Sequentially run the pipeline for multiple domains.
-    (Sequential to respect the 2 req/s rate limit.)
+    Run the pipeline for multiple domains, up to ``concurrency`` at a time.
+
+    Requests from all domains share the client's global rate limiter, so the
+    2 req/s cap still holds; concurrency lets one domain's clean/export
+    overlap with another's fetch. All domains draw their spinners in one
+    shared progress display.
 
     Returns:
         Dict of {domain_code: {format: path}} for all successful domains.
     """
     results: dict[str, dict[str, Path]] = {}
-    for code in domain_codes:
-        console.print(f"\n[cyan]→ Processing domain:[/cyan] [bold]{code}[/bold]")
-        try:
-            written = await run_pipeline(
-                domain_code=code,
-                lang=lang,
-                output_dir=output_dir,
-                to_csv=to_csv,
-                to_parquet=to_parquet,
-                parquet_compression=parquet_compression,
-                filters=filters,
-            )
+    sem = asyncio.Semaphore(concurrency)
+    size_cache = _SizeCache()
+
+    async def _one(client: FAOSTATClient, progress: Progress, code: str) -> None:
+        async with sem:
+            console.print(f"\n[cyan]→ Processing domain:[/cyan] [bold]{code}[/bold]")
+            try:
+                written = await run_pipeline(
+                    domain_code=code,
+                    lang=lang,
+                    output_dir=output_dir,
+                    to_csv=to_csv,
+                    to_parquet=to_parquet,
+                    parquet_compression=parquet_compression,
+                    parquet_compression_level=parquet_compression_level,
+                    filters=filters,
+                    client=client,
+                    stream=stream,
+                    progress=progress,
+                    cache=cache,
+                    partition_cols=partition_cols,
+                    size_cache=size_cache,
+                )
+            except Exception as e:
+                console.print(Text.from_markup(f"  [red]✗ {code} failed:[/red] ") + Text(str(e)))
+                return
             results[code] = written
-            for fmt, path in written.items():
-                console.print(f"  [green]✓[/green] {fmt.upper()}: {path}")
-        except Exception as e:
-            console.print(f"  [red]✗ Failed:[/red] {e}")
+            # One render and flush per domain rather than one per file
+            console.print(Group(*(
+                Text.from_markup(f"  [green]✓[/green] {code} {fmt.upper()}: ") + Text(str(path))
+                for fmt, path in written.items()
+            )))
 
-    return results
+    try:
+        async with FAOSTATClient() as client:
+            progress_cm = spinner_progress(console) if console.is_terminal else contextlib.nullcontext()
+            with progress_cm as progress:
+                await asyncio.gather(*(_one(client, progress, code) for code in domain_codes))
+    finally:
+        await close_all()
+    return {code: results[code] for code in domain_codes if code in results}
@@ -32,6 +32,8 @@ _MESSAGES: tuple[str, ...] = (
     "Putting the data out to pasture...",
     "Shearing the response payload...",
 )
+# Shuffled once at import; each spinner starts at a random offset into it
+_SHUFFLED: tuple[str, ...] = tuple(random.sample(_MESSAGES, len(_MESSAGES)))
 
 
 async def _rotate_status(
@@ -41,12 +43,10 @@ async def _rotate_status(
     interval: float,
 ) -> None:
     """Cycle through fun status messages in the background."""
-    messages = list(_MESSAGES)
-    random.shuffle(messages)
-    idx = 0
+    idx = random.randrange(len(_SHUFFLED))
     try:
         while True:
-            msg = messages[idx % len(messages)]
+            msg = _SHUFFLED[idx % len(_SHUFFLED)]
             progress.update(
                 task_id,
                 description=f"{label} \u2014 [dim]{msg}[/dim]",
@@ -57,11 +57,23 @@ async def _rotate_status(
         return
 
 
+def spinner_progress(console: Console) -> Progress:
+    """A transient spinner-plus-description Progress, shared by spin_while and the pipeline."""
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        transient=True,
+    )
+
+
 async def spin_while(
     coro: Awaitable[T],
     label: str = "Working",
     console: Console | None = None,
     interval: float = 2.0,
+    progress: Progress | None = None,
+    task_id: Any = None,
 ) -> T:
     """
     Run an awaitable with a fun rotating spinner.
@@ -70,28 +82,40 @@ async def spin_while(
         coro: The awaitable (e.g. an API call) to execute.
         label: Static prefix shown before the rotating message.
         console: Rich Console instance (creates one if not provided).
-        interval: Seconds between message rotations.
+        interval: Seconds between message rotations; 0 or less shows the
+            label without rotating.
+        progress: An already running Progress to draw in, instead of
+            starting a new live display.
+        task_id: Task of ``progress`` to update. A temporary task is added
+            (and removed afterwards) if omitted.
 
     Returns:
-        The result of the awaitable.
+        The result of the awaitable. When the console is not a terminal (CI,
+        redirected logs) and no ``progress`` is given, it is simply awaited.
     """
-    console = console or Console()
+    if progress is None:
+        console = console or Console()
+        if not console.is_terminal:
+            return await coro
+
+    async with contextlib.AsyncExitStack() as stack:
+        if progress is None:
+            progress = stack.enter_context(spinner_progress(console))
+        if task_id is None:
+            task_id = progress.add_task(f"{label}...", total=None)
+            stack.callback(progress.remove_task, task_id)
+        else:
+            progress.update(task_id, description=f"{label}...")
+
+        if interval <= 0:
+            return await coro
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-        transient=True,
-    ) as progress:
-        task = progress.add_task(f"{label}...", total=None)
         rotator = asyncio.create_task(
-            _rotate_status(progress, task, label, interval)
+            _rotate_status(progress, task_id, label, interval)
         )
         try:
-            result = await coro
+            return await coro
         finally:
             rotator.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 await rotator
-
-    return result
@@ -0,0 +1,19 @@
+import httpx
+import pytest
+
+from faostat_pipeline import client
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """Route every request the pipeline sends to ``handler(request) -> httpx.Response``."""
+    def install(handler):
+        class _MockedClient(httpx.AsyncClient):
+            def __init__(self, *args, **kwargs):
+                kwargs["transport"] = httpx.MockTransport(handler)
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(client, "API_TOKEN", "test-token")
+        monkeypatch.setattr(client.httpx, "AsyncClient", _MockedClient)
+
+    return install
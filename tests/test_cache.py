@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+import pandas as pd
+
+from faostat_pipeline.cache import cache_key, load_frame, load_validators, save_frame
+from faostat_pipeline.cleaner import clean_data
+from faostat_pipeline.pipeline import run_pipeline
+
+
+def _frame() -> pd.DataFrame:
+    return clean_data({"data": [
+        {"Area Code": str(i % 3), "Area": f"Area {i % 3}", "Year": str(2000 + i), "Value": i * 1.5}
+        for i in range(10)
+    ]})
+
+
+def test_cache_key_ignores_filter_order():
+    key = cache_key("QCL", "en", {"area": "4", "year": "2020"})
+    assert key == cache_key("QCL", "en", {"year": "2020", "area": "4"})
+    assert cache_key("QCL", "en", {"area": "4"}) != cache_key("QCL", "fr", {"area": "4"})
+
+
+def test_save_and_load_frame_round_trip(tmp_path):
+    df = _frame()
+    headers = httpx.Headers({"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+
+    assert save_frame(tmp_path, "QCL-key", df, headers)
+    pd.testing.assert_frame_equal(load_frame(tmp_path, "QCL-key"), df)
+    assert load_validators(tmp_path, "QCL-key") == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+
+
+def test_save_frame_skips_responses_without_validators(tmp_path):
+    assert not save_frame(tmp_path, "QCL-key", _frame(), httpx.Headers())
+    assert load_validators(tmp_path, "QCL-key") == {}
+
+
+def test_load_validators_ignores_a_corrupt_sidecar(tmp_path):
+    save_frame(tmp_path, "QCL-key", _frame(), httpx.Headers({"ETag": '"v1"'}))
+    (tmp_path / "QCL-key.meta.json").write_text("{not json")
+    assert load_validators(tmp_path, "QCL-key") == {}
+
+
+def test_run_pipeline_reuses_the_cache_on_304(tmp_path, mock_api):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"data": [
+            {"Area Code": "1", "Year": str(2000 + i), "Value": i * 1.5} for i in range(5)
+        ]}, headers={"ETag": '"v1"'})
+
+    mock_api(handler)
+    options = {"output_dir": tmp_path, "cache": True, "check_size_first": False, "show_progress": False}
+    first = asyncio.run(run_pipeline("QCL", **options))
+    before = pd.read_parquet(first["parquet"])
+    second = asyncio.run(run_pipeline("QCL", **options))
+
+    assert seen == [None, '"v1"']
+    pd.testing.assert_frame_equal(pd.read_parquet(second["parquet"]), before)
@@ -0,0 +1,28 @@
+from faostat_pipeline.cleaner import clean_data
+
+
+def _values(*values: float) -> dict:
+    return {"data": [{"Area Code": "1", "Year": str(2000 + i), "Value": v} for i, v in enumerate(values)]}
+
+
+def test_values_downcast_to_float32_when_exact():
+    assert str(clean_data(_values(1.5, 0.25, float("nan")))["value"].dtype) == "float32"
+
+
+def test_values_stay_float64_when_float32_would_round():
+    df = clean_data(_values(1.5, 12345.6789))
+    assert str(df["value"].dtype) == "float64"
+    assert df["value"].iloc[1] == 12345.6789
+
+
+def test_compact_off_keeps_float64():
+    assert str(clean_data(_values(1.5), compact=False)["value"].dtype) == "float64"
+
+
+def test_dedup_keeps_rows_that_differ_only_in_a_qualified_code_column():
+    df = clean_data({"data": [
+        {"Area Code": "1", "Item Code (CPC)": "0111", "Item": "Wheat", "Year": "2000", "Value": 1.0},
+        {"Area Code": "1", "Item Code (CPC)": "0112", "Item": "Maize", "Year": "2000", "Value": 2.0},
+        {"Area Code": "1", "Item Code (CPC)": "0112", "Item": "Maize", "Year": "2000", "Value": 3.0},
+    ]})
+    assert sorted(df["value"]) == [1.0, 3.0]
@@ -0,0 +1,68 @@
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+from tenacity import RetryCallState
+
+from faostat_pipeline import client
+from faostat_pipeline.client import FAOSTATClient, FAOSTATRateLimitError, close_all
+
+
+def _state_after(exc: BaseException) -> RetryCallState:
+    state = RetryCallState(retry_object=None, fn=None, args=(), kwargs={})
+    state.set_exception((type(exc), exc, None))
+    return state
+
+
+def _status_error(status: int, headers: dict[str, str]) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.org/data")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def test_wait_retry_after_uses_delta_seconds():
+    assert client._wait_retry_after(_state_after(FAOSTATRateLimitError("slow down", retry_after=7))) == 7
+
+
+def test_wait_retry_after_parses_http_date():
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    delay = client._wait_retry_after(_state_after(_status_error(503, {"Retry-After": when})))
+    assert 28 <= delay <= 30
+
+
+def test_wait_retry_after_past_date_means_no_wait():
+    when = email.utils.formatdate(time.time() - 30, usegmt=True)
+    assert client._wait_retry_after(_state_after(_status_error(503, {"Retry-After": when}))) == 0
+
+
+@pytest.mark.parametrize("headers", [{}, {"Retry-After": "soon"}, {"Retry-After": "3600"}])
+def test_wait_retry_after_falls_back_to_backoff(headers):
+    # Missing, unparseable and over-long (> _MAX_RETRY_AFTER) values all back off instead
+    delay = client._wait_retry_after(_state_after(_status_error(503, headers)))
+    assert 0 < delay <= 11
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "abc", "nan", "inf"])
+def test_rate_limit_rejects_non_positive_values(monkeypatch, value):
+    monkeypatch.setenv("FAOSTAT_RATE_LIMIT", value)
+    with pytest.raises(ValueError, match="FAOSTAT_RATE_LIMIT"):
+        client._rate_limit_from_env()
+
+
+def test_close_all_keeps_pools_that_are_still_borrowed(mock_api):
+    mock_api(lambda request: httpx.Response(200, json={}))
+
+    async def main():
+        async with FAOSTATClient() as outer:
+            async with FAOSTATClient():
+                pass
+            await close_all()
+            assert not outer._client.is_closed
+            pool = outer._client
+        await close_all()
+        assert pool.is_closed
+        assert outer.base_url not in client._shared_clients
+
+    asyncio.run(main())
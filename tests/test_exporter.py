@@ -0,0 +1,110 @@
+import asyncio
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from faostat_pipeline.cleaner import clean_data
+from faostat_pipeline.exporter import export, export_async, export_partitioned, export_stream
+
+
+def _raw(n: int = 20) -> dict:
+    return {"data": [
+        {"Area Code": str(i % 3), "Area": f"Area {i % 3}", "Item Code": "1",
+         "Year": str(2000 + i % 4), "Value": i * 1.5, "Flag": "A"}
+        for i in range(n)
+    ]}
+
+
+def test_export_round_trips_csv_and_parquet(tmp_path):
+    df = clean_data(_raw())
+    out = export(df, "QCL", tmp_path)
+
+    assert set(out) == {"csv", "parquet"}
+    pd.testing.assert_frame_equal(pd.read_parquet(out["parquet"]), df.reset_index(drop=True))
+    assert len(pd.read_csv(out["csv"])) == len(df)
+
+
+def test_export_async_matches_export(tmp_path):
+    df = clean_data(_raw())
+    out = asyncio.run(export_async(df, "QCL", tmp_path))
+
+    pd.testing.assert_frame_equal(pd.read_parquet(out["parquet"]), df.reset_index(drop=True))
+    assert pd.read_csv(out["csv"])["value"].tolist() == df["value"].tolist()
+
+
+def test_export_async_partitioned_reads_back_with_pandas(tmp_path):
+    df = clean_data(_raw())
+    out = asyncio.run(export_async(df, "QCL", tmp_path, to_csv=False, partition_cols=["year"]))
+
+    back = pd.read_parquet(out["parquet"], filters=[("year", "=", 2001)])
+    assert len(back) == (df["year"] == 2001).sum()
+    assert set(back["year"].astype(int)) == {2001}
+    assert sorted(back["value"]) == sorted(df.loc[df["year"] == 2001, "value"])
+
+
+def test_export_async_partitioned_replaces_earlier_partitions(tmp_path):
+    df = clean_data(_raw())
+    asyncio.run(export_async(df, "QCL", tmp_path, partition_cols=["year"]))
+    out = asyncio.run(export_async(df[df["year"] == 2003], "QCL", tmp_path, partition_cols=["year"]))
+
+    assert [p.name for p in out["parquet"].iterdir()] == ["year=2003"]
+    assert (out["parquet"].parent / "data.csv").exists()
+    assert len(pd.read_parquet(out["parquet"])) == (df["year"] == 2003).sum()
+
+
+def test_export_partitioned_reads_back_with_pandas(tmp_path):
+    df = clean_data(_raw())
+    written = export_partitioned(df, "QCL", ["year", "area_code"], output_dir=tmp_path)
+
+    assert {p.parent.parent.name for p in written} == {f"year={y}" for y in range(2000, 2004)}
+    back = pd.read_parquet(tmp_path / "QCL" / "data", filters=[("year", "=", 2002)])
+    assert len(back) == (df["year"] == 2002).sum()
+
+
+def test_export_partitioned_replaces_earlier_partitions(tmp_path):
+    df = clean_data(_raw())
+    export(df, "QCL", tmp_path)
+    export_partitioned(df, "QCL", output_dir=tmp_path)
+    export_partitioned(df[df["year"] == 2001], "QCL", output_dir=tmp_path)
+
+    dataset = tmp_path / "QCL" / "data"
+    assert [p.name for p in dataset.iterdir()] == ["year=2001"]
+    assert len(pd.read_parquet(dataset)) == (df["year"] == 2001).sum()
+
+
+def test_export_stream_accepts_wider_later_chunks(tmp_path):
+    def batch(n: int, value: float) -> pd.DataFrame:
+        return clean_data({"data": [
+            {"Area Code": "1", "Item Code": str(i), "Item": f"Item {i}",
+             "Year": "2001", "Value": value, "Flag": "A"}
+            for i in range(n)
+        ]})
+
+    # 10 categories fit an int8 dictionary index and 1.5 fits float32; 300 and 12345.6789 don't
+    async def frames():
+        yield batch(10, 1.5)
+        yield batch(300, 12345.6789)
+
+    out = asyncio.run(export_stream(frames(), "QCL", tmp_path))
+
+    back = pd.read_parquet(out["parquet"])
+    assert len(back) == 310
+    assert back["item"].nunique() == 300
+    assert back["value"].iloc[-1] == 12345.6789
+    assert len(pd.read_csv(out["csv"])) == 310
+
+
+def test_export_writes_statistics_for_year_and_code_columns(tmp_path):
+    df = clean_data({"data": [
+        {"Area Code (M49)": "004", "Item Code (CPC)": "0111", "Item": "Wheat",
+         "Year": str(2000 + i), "Value": float(i)}
+        for i in range(5)
+    ]})
+    out = export(df, "QCL", tmp_path, to_csv=False)
+
+    row_group = pq.ParquetFile(out["parquet"]).metadata.row_group(0)
+    with_stats = {
+        row_group.column(i).path_in_schema
+        for i in range(row_group.num_columns) if row_group.column(i).is_stats_set
+    }
+    assert with_stats == {"year", "area_code_(m49)", "item_code_(cpc)"}